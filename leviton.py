@@ -4,8 +4,35 @@ This module provides a controller for the Leviton Decora Smart Wi-Fi Plug-in Dim
 It allows you to login to the Leviton API, list devices, get the status of the smart plug,
 and set the plug on or off.
 """
+import json
+import logging
+import time
+from pathlib import Path
+
 import requests
-from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson parses/serializes several times faster than stdlib json; fall back
+# to requests' built-in handling when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Timeouts for every API call so a stalled connection can't hang the caller
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 10.0
+
+logger = logging.getLogger(__name__)
+
+
+def _json_loads(response):
+    """Decode a JSON response body, preferring orjson when available"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
 
 class LevitonController:
     """Based on https://github.com/tlyakhov/python-decora_wifi"""
@@ -20,18 +47,74 @@ class LevitonController:
         self.residence_id = "903353"
         self.device_id = "1920823"
 
+        # Reuse one session so the HTTPS connection to my.leviton.com stays
+        # alive between calls instead of paying a TLS handshake each time.
+        self._session = requests.Session()
+        self._session.headers.update({"User-Agent": "water-watcher/1.0"})
+        self._session.mount(
+            "https://",
+            HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=4,
+                max_retries=Retry(
+                    total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]
+                ),
+            ),
+        )
+
+        # The token is a long-lived bearer; cache it on disk so restarts
+        # skip the password round trip to /Person/login.
+        self._token_path = Path("~/.cache/water-watcher/leviton.json").expanduser()
+        self._load_cached_token()
+
+    def _load_cached_token(self):
+        """Reuse a previously cached access token if it hasn't expired"""
+        try:
+            cached = json.loads(self._token_path.read_text())
+        except (OSError, ValueError):
+            return
+
+        if cached.get("expires", 0) > time.time() + 60:
+            self.access_token = cached.get("id")
+            self._session.headers["Authorization"] = self.access_token
+
+    def _save_cached_token(self, token, ttl):
+        """Persist the access token so process restarts skip re-login"""
+        try:
+            self._token_path.parent.mkdir(parents=True, exist_ok=True)
+            self._token_path.write_text(
+                json.dumps({"id": token, "expires": time.time() + ttl})
+            )
+            self._token_path.chmod(0o600)
+        except OSError as e:
+            logger.warning("Failed to cache token: %s", e)
+
+    def _invalidate_cached_token(self):
+        """Drop the cached token (e.g. after the server rejects it)"""
+        self.access_token = None
+        self._session.headers.pop("Authorization", None)
+        try:
+            self._token_path.unlink()
+        except OSError:
+            pass
+
     def login(self):
         """Login to Leviton API and get access token"""
         login_url = f"{self.base_url}/Person/login"
         payload = {"email": self._email, "password": self._password}
 
         try:
-            response = requests.post(login_url, json=payload)
+            response = self._session.post(
+                login_url, json=payload, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)
+            )
             response.raise_for_status()
-            self.access_token = response.json().get("id")
-            print("Successfully logged in to Leviton")
+            data = _json_loads(response)
+            self.access_token = data.get("id")
+            self._session.headers["Authorization"] = self.access_token
+            self._save_cached_token(self.access_token, data.get("ttl", 86400))
+            logger.info("Successfully logged in to Leviton")
         except requests.exceptions.RequestException as e:
-            print(f"Failed to login: {e}")
+            logger.error("Failed to login: %s", e)
             raise
 
     def _call_api(self, endpoint, method="GET", payload=None):
@@ -41,23 +124,40 @@ class LevitonController:
             self.login()
 
         url = f"{self.base_url}/{endpoint}"
-        headers = {"Authorization": self.access_token}
 
-        try:
-            if method == "GET":
-                response = requests.get(url, headers=headers)
-            elif method == "POST":
-                response = requests.post(url, headers=headers, json=payload)
-            elif method == "PUT":
-                response = requests.put(url, headers=headers, json=payload)
-            else:
-                raise ValueError("Invalid HTTP method")
-
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"API call failed: {e}")
-            raise
+        # Pre-serialize the payload with orjson when available, skipping
+        # requests' internal json.dumps
+        if payload is not None and orjson is not None:
+            body_kwargs = {
+                "data": orjson.dumps(payload),
+                "headers": {"Content-Type": "application/json"},
+            }
+        else:
+            body_kwargs = {"json": payload}
+
+        for attempt in (1, 2):
+            try:
+                timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
+                if method == "GET":
+                    response = self._session.get(url, timeout=timeout)
+                elif method == "POST":
+                    response = self._session.post(url, timeout=timeout, **body_kwargs)
+                elif method == "PUT":
+                    response = self._session.put(url, timeout=timeout, **body_kwargs)
+                else:
+                    raise ValueError("Invalid HTTP method")
+
+                if response.status_code == 401 and attempt == 1:
+                    # Cached token was rejected; drop it and re-login once
+                    self._invalidate_cached_token()
+                    self.login()
+                    continue
+
+                response.raise_for_status()
+                return _json_loads(response)
+            except requests.exceptions.RequestException as e:
+                logger.error("API call failed: %s", e)
+                raise
 
     def list_devices(self):
         """List all devices and their IDs"""
@@ -78,7 +178,7 @@ class LevitonController:
 
             return devices
         except requests.exceptions.RequestException as e:
-            print(f"Failed to list devices: {e}")
+            logger.error("Failed to list devices: %s", e)
             raise
 
     def get_plug_status(self):
@@ -89,7 +189,7 @@ class LevitonController:
             status = self._call_api(control_url, method="GET")
             return status['power']
         except requests.exceptions.RequestException as e:
-            print(f"Failed to get plug status: {e}")
+            logger.error("Failed to get plug status: %s", e)
             raise
 
     def set_plug(self, power):
@@ -101,11 +201,9 @@ class LevitonController:
 
         try:
             self._call_api(control_url, method="PUT", payload=payload)
-            print(
-                f"Successfully turned on plug at {datetime.now().strftime('%H:%M:%S')}"
-            )
+            logger.info("Plug set to %s", power)
         except requests.exceptions.RequestException as e:
-            print(f"Failed to turn on plug: {e}")
+            logger.error("Failed to set plug to %s: %s", power, e)
             raise
 
 
@@ -1,8 +1,13 @@
 import RPi.GPIO as GPIO
+import atexit
+import queue
+import threading
 import time
 from datetime import datetime, timedelta
 import logging
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
 import sqlite3
 from typing import Optional
@@ -10,50 +15,94 @@ import argparse
 
 from leviton import LevitonController
 
+# Timeouts for every HTTP call so a stalled connection can't block monitoring
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 10.0
+
+# The hostname can't change while we're running; grab it once
+_NODENAME = os.uname().nodename
+
 
 class Database:
+    # Flush buffered events once either threshold is hit
+    FLUSH_MAX_EVENTS = 16
+    FLUSH_MAX_AGE = 5.0
+
+    _INSERT_SQL = (
+        "INSERT INTO water_events (status, location, action_taken) VALUES (?, ?, ?)"
+    )
+    _SELECT_RECENT_SQL = "SELECT * FROM water_events ORDER BY timestamp DESC LIMIT ?"
+
     def __init__(self, db_path: str = "water_sensor.db"):
         """Initialize database connection"""
         self.db_path = db_path
+        self._conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+        # Buffer events and write them in one transaction, so N state
+        # changes cost one fsync instead of N
+        self._buffer: list = []
+        self._last_flush = time.monotonic()
+
         self.init_db()
+        atexit.register(self.close)
 
     def init_db(self):
         """Create database and tables if they don't exist"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS water_events (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    status TEXT NOT NULL,
-                    location TEXT,
-                    action_taken TEXT
-                )
+        self._conn.execute(
             """
+            CREATE TABLE IF NOT EXISTS water_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                status TEXT NOT NULL,
+                location TEXT,
+                action_taken TEXT
             )
-            conn.commit()
+        """
+        )
 
     def log_event(self, status: str, location: str, action_taken: Optional[str] = None):
-        """Log a water detection event"""
+        """Buffer a water detection event, flushing in batches"""
+        self._buffer.append((status, location, action_taken))
+        if (
+            len(self._buffer) >= self.FLUSH_MAX_EVENTS
+            or time.monotonic() - self._last_flush > self.FLUSH_MAX_AGE
+        ):
+            self._flush()
+
+    def _flush(self):
+        """Write all buffered events in a single transaction"""
+        if not self._buffer:
+            self._last_flush = time.monotonic()
+            return
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "INSERT INTO water_events (status, location, action_taken) VALUES (?, ?, ?)",
-                    (status, location, action_taken),
-                )
-                conn.commit()
+            self._conn.execute("BEGIN")
+            self._conn.executemany(self._INSERT_SQL, self._buffer)
+            self._conn.execute("COMMIT")
+            self._buffer.clear()
         except Exception as e:
             logging.error(f"Database error: {str(e)}")
+            # Roll back the open transaction so the next flush can retry;
+            # the buffered events stay queued
+            try:
+                self._conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+        finally:
+            self._last_flush = time.monotonic()
 
     def get_recent_events(self, limit: int = 10):
         """Get recent water detection events"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            return cursor.execute(
-                "SELECT * FROM water_events ORDER BY timestamp DESC LIMIT ?", (limit,)
-            ).fetchall()
+        self._flush()
+        return self._conn.execute(self._SELECT_RECENT_SQL, (limit,)).fetchall()
+
+    def close(self):
+        """Flush any buffered events and close the connection"""
+        self._flush()
+        self._conn.close()
 
 
 class TelegramNotifier:
@@ -61,12 +110,24 @@ class TelegramNotifier:
         self._token = token
         self._chat_id = chat_id
         self.base_url = f"https://api.telegram.org/bot{token}"
+        self._send_url = f"{self.base_url}/sendMessage"
+
+        # One session keeps the TLS connection to api.telegram.org alive
+        # between notifications instead of re-handshaking on every message.
+        self._session = requests.Session()
+        self._session.mount(
+            "https://",
+            HTTPAdapter(
+                pool_maxsize=2, max_retries=Retry(total=2, backoff_factor=0.5)
+            ),
+        )
 
     def send_message(self, message: str) -> bool:
         try:
-            url = f"{self.base_url}/sendMessage"
             data = {"chat_id": self._chat_id, "text": message, "parse_mode": "HTML"}
-            response = requests.post(url, data=data)
+            response = self._session.post(
+                self._send_url, data=data, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)
+            )
             response.raise_for_status()
             return True
         except Exception as e:
@@ -91,18 +152,30 @@ class WaterDetector:
         self.power_pin = power_pin
         self.telegram = telegram_notifier
         self.db = database
-        self.location = os.uname().nodename
+        self.location = _NODENAME
         self.debug = debug
 
         self.leviton_cntrl = leviton_cntrl
 
-        # State tracking
+        # State tracking (monotonic floats so comparisons are a single
+        # subtraction instead of datetime arithmetic)
         self.last_state = False
-        self.last_reading_time = None
-        self.last_notification_time = None
+        self._last_reading_mono = None
+        self._last_notify_mono = None
 
         # Minimum time between notifications
         self.notification_cooldown = timedelta(hours=1) if debug else timedelta(hours=6)
+        self._cooldown_sec = self.notification_cooldown.total_seconds()
+
+        # Notification skeleton; the location never changes so it's baked
+        # in, and only the changing fields are substituted per message
+        self._msg_tmpl = (
+            "{emoji} Water Sensor Update {emoji}\n"
+            f"Location: {self.location}\n"
+            "Status: {status}\n"
+            "Time: {time}\n"
+            "Duration: {duration}"
+        )
 
         # Setup logging
         logging.basicConfig(
@@ -111,136 +184,221 @@ class WaterDetector:
             format="%(asctime)s - %(levelname)s - %(message)s",
         )
 
-        # Setup GPIO
+        # Setup GPIO; keep the sensor powered so the pin can generate edges
         GPIO.setmode(GPIO.BCM)
         GPIO.setup(self.sensor_pin, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
         GPIO.setup(self.power_pin, GPIO.OUT)
+        GPIO.output(self.power_pin, GPIO.HIGH)
+
+        # Edge callbacks run on RPi.GPIO's thread; serialize state updates
+        # against the heartbeat loop
+        self._state_lock = threading.Lock()
+
+        # Constant DC across the probe promotes electrolytic corrosion;
+        # briefly cut power once an hour to depolarize it
+        self._last_depolarize_mono = time.monotonic()
 
         # Initialize database if not provided
         if not self.db:
             self.db = Database()
 
+        # Network I/O runs on background workers so a slow Leviton or
+        # Telegram call never stalls the sensor polling loop; two workers
+        # let independent Leviton and Telegram requests overlap instead of
+        # running as serial WAN round trips
+        self._io_queue: queue.Queue = queue.Queue(maxsize=32)
+        for _ in range(2):
+            threading.Thread(target=self._io_worker, daemon=True).start()
+
         logging.info("Water detector initialized")
         if self.telegram:
             self.telegram.send_message(
                 "🔄 Water detection system initialized and monitoring"
             )
 
-    def debug_print(self, message: str):
-        """Print debug messages if debug mode is on"""
+    def _io_worker(self):
+        """Run queued network calls off the monitor thread"""
+        while True:
+            job = self._io_queue.get()
+            try:
+                job()
+            except Exception as e:
+                logging.error(f"Background I/O error: {str(e)}")
+            finally:
+                self._io_queue.task_done()
+
+    def _submit_io(self, job):
+        """Queue a network call, dropping the oldest job if the queue is full"""
+        try:
+            self._io_queue.put_nowait(job)
+        except queue.Full:
+            try:
+                self._io_queue.get_nowait()
+            except queue.Empty:
+                pass
+            self._io_queue.put_nowait(job)
+
+    def _turn_bird_bath_on(self):
+        """Turn the bird bath plug on if it is off (runs on the I/O worker)"""
+        try:
+            if self.leviton_cntrl.get_plug_status() != "OFF":
+                return
+
+            self.debug_print("Plug is OFF, turning it ON")
+
+            self.leviton_cntrl.set_plug("ON")
+
+            message = "Turning plug on."
+            self.debug_print(message)
+            logging.info(message)
+
+            if self.telegram:
+                telegram_msg = (
+                    "💧 Water Sensor Update 💧\n"
+                    "Water detected.\n"
+                    "Turning bird bath ON"
+                )
+                self.telegram.send_message(telegram_msg)
+        except requests.Timeout as e:
+            # Keep monitoring; the plug will be retried next pass
+            logging.error(f"Leviton request timed out: {str(e)}")
+
+    def debug_print(self, message: str, *args):
+        """Print debug messages if debug mode is on
+
+        Takes %-style args so callers defer string formatting: nothing is
+        built unless debug mode is actually on.
+        """
         if self.debug:
-            print(f"DEBUG: {message}")
-            logging.debug(message)
+            print(f"DEBUG: {message % args if args else message}")
+            logging.debug(message, *args)
 
-    def should_notify(self) -> bool:
+    def should_notify(self, now_mono: float) -> bool:
         """Check if enough time has passed to send another notification"""
-        if not self.last_notification_time:
+        if self._last_notify_mono is None:
             return True
-        return datetime.now() - self.last_notification_time > self.notification_cooldown
+        return now_mono - self._last_notify_mono > self._cooldown_sec
 
     def check_water(self) -> bool:
         try:
-            self.debug_print("Starting water check")
-            GPIO.output(self.power_pin, GPIO.HIGH)
-            time.sleep(0.1)
-
-            readings = []
+            # The sensor stays powered, so no warm-up is needed; it is
+            # level-driven, so back-to-back reads are as good as spaced ones.
+            # A running int keeps the majority vote allocation-free: no list,
+            # no sum(), just an integer compare.
+            count = 0
             for _ in range(5):
-                reading = GPIO.input(self.sensor_pin)
-                readings.append(reading)
-                self.debug_print(f"Sensor reading: {reading}")
-                time.sleep(0.01)
+                count += GPIO.input(self.sensor_pin)
 
-            GPIO.output(self.power_pin, GPIO.LOW)
-
-            result = sum(readings) > len(readings) / 2
-            self.debug_print(f"Water check result: {result}")
+            result = count >= 3
+            self.debug_print("Water check result: %s (%d/5 high)", result, count)
             return result
 
         except Exception as e:
             logging.error(f"Error checking water: {str(e)}")
-            GPIO.output(self.power_pin, GPIO.LOW)
             if self.telegram:
                 self.telegram.send_message(f"⚠️ Error checking water sensor: {str(e)}")
             raise
 
+    def _handle_reading(self):
+        """Sample the sensor and run the notification/automation logic"""
+        with self._state_lock:
+            current_time = datetime.now()  # wall clock, for display only
+            now_mono = time.monotonic()
+
+            if now_mono - self._last_depolarize_mono > 3600:
+                self.debug_print("Depolarizing sensor")
+                GPIO.output(self.power_pin, GPIO.LOW)
+                time.sleep(0.05)
+                GPIO.output(self.power_pin, GPIO.HIGH)
+                # Let the sensor settle before sampling, as at power-up;
+                # once an hour the 100ms stall is negligible
+                time.sleep(0.1)
+                self._last_depolarize_mono = now_mono
+
+            current_state = self.check_water()
+            emoji = "💧" if current_state else "🔹"
+
+            self.debug_print("Current state: %s at %s", current_state, current_time)
+
+            if current_time.hour > 6 and current_time.hour < 18 and current_state:
+                if self.leviton_cntrl:
+                    self._submit_io(self._turn_bird_bath_on)
+
+            if self._last_reading_mono is None:
+                # Initial reading
+                self._last_reading_mono = now_mono
+                self.last_state = current_state
+
+                state_changed = True
+            else:
+                state_changed = current_state != self.last_state
+
+            if state_changed or self.should_notify(now_mono):
+                status = "WET" if current_state else "DRY"
+                message = f"Status changed to: {status}"
+                self.debug_print(message)
+                logging.info(message)
+
+                time_since_last_reading = timedelta(
+                    seconds=now_mono - self._last_reading_mono
+                )
+
+                # Log to database
+                if self.db:
+                    self.db.log_event(
+                        status=status,
+                        location=self.location,
+                        action_taken=f"Time since last reading: {time_since_last_reading}",
+                    )
+
+                # Send notification if enabled
+                if self.telegram:
+                    telegram_msg = self._msg_tmpl.format_map(
+                        {
+                            "emoji": emoji,
+                            "status": status,
+                            "time": current_time.strftime("%Y-%m-%d %H:%M:%S"),
+                            "duration": time_since_last_reading,
+                        }
+                    )
+                    self._submit_io(
+                        lambda msg=telegram_msg: self.telegram.send_message(msg)
+                    )
+                    self._last_notify_mono = now_mono
+
+                self.last_state = current_state
+                self._last_reading_mono = now_mono
+
+    def _on_edge(self, channel):
+        """Edge callback; runs on RPi.GPIO's event thread"""
+        self.debug_print("Edge detected on channel %s", channel)
+        self._handle_reading()
+
     def monitor(self, check_interval: float = 1):
         """
-        Continuously monitor for water with improved state tracking and debugging
+        Monitor for water, waking on sensor edges with a periodic heartbeat
         """
         print("\nStarting water monitoring...")
         print("Press CTRL+C to stop\n")
 
         try:
+            # The OS wakes us on level transitions; the loop below is only a
+            # heartbeat that renews cooldown notifications and catches any
+            # missed edge
+            GPIO.add_event_detect(
+                self.sensor_pin, GPIO.BOTH, callback=self._on_edge, bouncetime=100
+            )
+
+            # Fixed-rate schedule: sleep to the next tick rather than a full
+            # interval, so slow readings or network stalls don't accumulate
+            # drift over hours of running
+            next_tick = time.monotonic() + check_interval
             while True:
-                current_time = datetime.now()
-                current_state = self.check_water()
-                emoji = "💧" if current_state else "🔹"
-
-                self.debug_print(f"Current state: {current_state} at {current_time}")
-
-                if current_time.hour > 6 and current_time.hour < 18 and current_state:
-                    if (
-                        self.leviton_cntrl
-                        and self.leviton_cntrl.get_plug_status() == "OFF"
-                    ):
-                        self.debug_print("Plug is OFF, turning it ON")
-
-                        self.leviton_cntrl.set_plug("ON")
-
-                        message = "Turning plug on."
-                        self.debug_print(message)
-                        logging.info(message)
-
-                        if self.telegram:
-                            telegram_msg = (
-                                f"{emoji} Water Sensor Update {emoji}\n"
-                                f"Water detected.\n"
-                                f"Turning bird bath ON"
-                            )
-                            self.telegram.send_message(telegram_msg)
-
-                if self.last_reading_time is None:
-                    # Initial reading
-                    self.last_reading_time = current_time
-                    self.last_state = current_state
-
-                    state_changed = True
-                else:
-                    state_changed = current_state != self.last_state
-
-                if state_changed or self.should_notify():
-                    status = "WET" if current_state else "DRY"
-                    message = f"Status changed to: {status}"
-                    self.debug_print(message)
-                    logging.info(message)
-
-                    time_since_last_reading = current_time - self.last_reading_time
-
-                    # Log to database
-                    if self.db:
-                        self.db.log_event(
-                            status=status,
-                            location=self.location,
-                            action_taken=f"Time since last reading: {time_since_last_reading}",
-                        )
-
-                    # Send notification if enabled
-                    if self.telegram:
-                        telegram_msg = (
-                            f"{emoji} Water Sensor Update {emoji}\n"
-                            f"Location: {self.location}\n"
-                            f"Status: {status}\n"
-                            f"Time: {current_time.strftime('%Y-%m-%d %H:%M:%S')}\n"
-                            f"Duration: {time_since_last_reading}"
-                        )
-                        self.telegram.send_message(telegram_msg)
-                        self.last_notification_time = current_time
-
-                    self.last_state = current_state
-                    self.last_reading_time = current_time
-
-                time.sleep(check_interval)
+                self._handle_reading()
+                sleep_for = next_tick - time.monotonic()
+                if sleep_for > 0:
+                    time.sleep(sleep_for)
+                next_tick += check_interval
 
         except KeyboardInterrupt:
             print("\nMonitoring stopped by user")